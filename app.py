@@ -1,20 +1,41 @@
-import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
 
 import altair as alt
+import ijson
+import orjson
 import pandas as pd
 import streamlit as st
 
+from core.eval_table import SCORE_FIELDS, build_eval_df, build_long_eval_df, read_eval_table
 
 BASE_DIR = Path(__file__).resolve().parent
 OUTPUT_DIR = BASE_DIR / "output"
 
 
-def load_json(path: Path) -> Optional[Any]:
+def file_signature(path: Path) -> Tuple[str, int, int]:
+    """
+    Cache key for a results file: changes whenever the file is rewritten.
+    """
+    stat = path.stat()
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+# file caches hold two entries per file (current signature plus the one it
+# replaced), so a results file rewritten by a run cannot pile up stale parses
+@st.cache_data(show_spinner=False, max_entries=2)
+def read_json(path_str: str, mtime_ns: int, size: int) -> Any:
+    # mtime/size are only part of the cache key; reruns reuse the parsed data
+    return orjson.loads(Path(path_str).read_bytes())
+
+
+def load_cached(path: Path, loader: Callable[..., Any], *args: Any) -> Optional[Any]:
+    """
+    Call a cached `loader(path_str, mtime_ns, size, *args)` for `path`,
+    reporting unreadable files in the page instead of raising.
+    """
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return loader(*file_signature(path), *args)
     except FileNotFoundError:
         return None
     except Exception as exc:  # noqa: BLE001
@@ -22,64 +43,158 @@ def load_json(path: Path) -> Optional[Any]:
         return None
 
 
-def build_eval_df(records: List[Dict[str, Any]]) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-    for rec in records:
-        evals = rec.get("evaluation", []) or []
-        for ev in evals:
-            parsed = ev.get("score_parsed") or {}
-            overall = parsed.get("overall")
-            rows.append(
-                {
-                    "model_id": rec.get("model_id"),
-                    "model_name": rec.get("model_name"),
-                    "task_id": rec.get("task_id"),
-                    "evaluator": ev.get("evaluator_model_id"),
-                    "clarity": parsed.get("clarity"),
-                    "coherence": parsed.get("coherence"),
-                    "reasoning_depth": parsed.get("reasoning_depth"),
-                    "safety": parsed.get("safety"),
-                    "overall": overall,
-                    "lift_pct": (overall / 10 * 100) if overall is not None else None,
-                    "comment": parsed.get("comment") or ev.get("score_raw"),
-                }
-            )
-    return pd.DataFrame(rows)
-
-
-def build_long_eval_df(long_data: Dict[str, Any]) -> pd.DataFrame:
-    rows: List[Dict[str, Any]] = []
-    for model_id, rec in long_data.items():
-        model_name = rec.get("model_name")
-        for task_id, task_rec in rec.get("tasks", {}).items():
-            for ev in task_rec.get("final_evaluation", []) or []:
-                parsed = ev.get("score_parsed") or {}
-                overall = parsed.get("overall")
-                rows.append(
-                    {
-                        "model_id": model_id,
-                        "model_name": model_name,
-                        "task_id": task_id,
-                        "evaluator": ev.get("evaluator_model_id"),
-                        "clarity": parsed.get("clarity"),
-                        "coherence": parsed.get("coherence"),
-                        "reasoning_depth": parsed.get("reasoning_depth"),
-                        "safety": parsed.get("safety"),
-                        "overall": overall,
-                        "lift_pct": (overall / 10 * 100) if overall is not None else None,
-                        "comment": parsed.get("comment") or ev.get("score_raw"),
-                    }
-                )
-    return pd.DataFrame(rows)
-
-
-def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
+@st.cache_data(show_spinner=False, max_entries=2)
+def list_long_models(path_str: str, mtime_ns: int, size: int) -> List[str]:
+    # top-level keys only: streams the file without building any model's subtree
+    with open(path_str, "rb") as f:
+        return sorted(
+            value for prefix, event, value in ijson.parse(f) if prefix == "" and event == "map_key"
+        )
+
+
+# one entry per model, so room for a results file's models plus a stale copy
+@st.cache_data(show_spinner=False, max_entries=16)
+def load_long_model(path_str: str, mtime_ns: int, size: int, model_id: str) -> Optional[Dict[str, Any]]:
+    # kvitems materializes one model at a time; ijson prefixes can't address
+    # keys containing dots (e.g. "GPT5.1"), so match keys here instead
+    with open(path_str, "rb") as f:
+        for key, value in ijson.kvitems(f, "", use_float=True):
+            if key == model_id:
+                return value
+    return None
+
+
+@st.cache_resource(show_spinner=False, max_entries=2)
+def index_single(path_str: str, mtime_ns: int, size: int) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    (model_id, task_id) -> single-turn record. Shared across reruns without
+    copying, so callers must treat the records as read-only.
+    """
+    records = read_json(path_str, mtime_ns, size) or []
+    return {(rec["model_id"], rec["task_id"]): rec for rec in records}
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def single_ids(path_str: str, mtime_ns: int, size: int) -> Tuple[List[str], List[str]]:
+    """
+    Sorted model and task ids of the single-turn records, for the selectors;
+    from the records, so unscored records stay browsable.
+    """
+    records_by_key = index_single(path_str, mtime_ns, size)
+    return (
+        sorted({model_id for model_id, _ in records_by_key}),
+        sorted({task_id for _, task_id in records_by_key}),
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _eval_df_for(path_str: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    return build_eval_df(read_json(path_str, mtime_ns, size) or [])
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def _long_eval_df_for(path_str: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    # stream one model at a time and keep only the scores, never the whole file
+    slim: Dict[str, Any] = {}
+    with open(path_str, "rb") as f:
+        for model_id, rec in ijson.kvitems(f, "", use_float=True):
+            slim[model_id] = {
+                "model_name": rec.get("model_name"),
+                "tasks": {
+                    task_id: {"final_evaluation": task_rec.get("final_evaluation")}
+                    for task_id, task_rec in rec.get("tasks", {}).items()
+                },
+            }
+    return build_long_eval_df(slim)
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _eval_table_for(path_str: str, mtime_ns: int, size: int) -> pd.DataFrame:
+    return read_eval_table(Path(path_str))
+
+
+def load_eval_df(
+    table_path: Path,
+    json_path: Path,
+    from_json: Callable[[str, int, int], pd.DataFrame],
+) -> pd.DataFrame:
+    """
+    Load the flat evaluation table written next to the JSON results, falling
+    back to rebuilding it from the JSON when it is missing or older.
+    """
+    try:
+        json_sig = file_signature(json_path)
+    except FileNotFoundError:
+        return build_eval_df([])
+
+    if table_path.exists() and table_path.stat().st_mtime_ns >= json_sig[1]:
+        try:
+            return _eval_table_for(*file_signature(table_path))
+        except Exception as exc:  # noqa: BLE001
+            # e.g. truncated by a killed run; the JSON is still the source of truth
+            st.error(f"Failed to load {table_path}: {exc}. Rebuilding scores from {json_path.name}.")
+
+    try:
+        return from_json(*json_sig)
+    except Exception:  # noqa: BLE001
+        # load_cached reports the broken JSON file where the view reads it
+        return build_eval_df([])
+
+
+NUMERIC_COLS = ["overall", "clarity", "coherence", "reasoning_depth", "safety", "lift_pct"]
+TOTALS_KEYS = ["model_id", "task_id", "evaluator"]
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def score_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per (model, task, evaluator) sums and non-null counts of the numeric
+    scores: the only pass over the full table, every summary rolls up from it.
+    """
+    grouped = df.groupby(TOTALS_KEYS, observed=True)[NUMERIC_COLS]
+    return grouped.sum().join(grouped.count(), rsuffix="_n").reset_index()
+
+
+def mean_by(totals: pd.DataFrame, by: Sequence[str], cols: Sequence[str]) -> pd.DataFrame:
+    # sum/count rather than a mean of means, so unequal cell sizes weigh correctly
+    grouped = totals.groupby(list(by), observed=True)
+    sums = grouped[list(cols)].sum()
+    counts = grouped[[f"{col}_n" for col in cols]].sum().to_numpy()
+    return (sums / counts).reset_index()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def box_stats(df: pd.DataFrame, by: str, value: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Per-group box plot summary using Vega-Lite's boxplot rules (quartiles,
+    whiskers at the furthest points within 1.5 IQR, the rest as outliers),
+    so the chart ships one row per group instead of every score.
+    """
+    rows = df[[by, value]].dropna()
+    grouped = rows.groupby(by, observed=True)[value]
+    quantiles = [0.25, 0.5, 0.75]
+    # reindex so an all-NaN column (no rows left) still yields the three columns
+    stats = grouped.quantile(quantiles).unstack().reindex(columns=quantiles)
+    stats.columns = ["q1", "median", "q3"]
+
+    bounds = rows.join(stats, on=by)
+    iqr = bounds["q3"] - bounds["q1"]
+    inside = bounds[value].between(bounds["q1"] - 1.5 * iqr, bounds["q3"] + 1.5 * iqr)
+    whiskers = bounds[inside].groupby(by, observed=True)[value].agg(lower="min", upper="max")
+    outliers = bounds.loc[~inside, [by, value]].reset_index(drop=True)
+    return stats.join(whiskers).reset_index(), outliers
+
+
+def render_single_turn(
+    records_by_key: Dict[Tuple[str, str], Dict[str, Any]],
+    ids: Tuple[List[str], List[str]],
+    eval_df_all: pd.DataFrame,
+) -> None:
     st.subheader("Single-Turn Tasks (Baseline vs CBT)")
-    if not single_data:
+    if not records_by_key:
         st.info("No single_turn_results.json found in output/. Run run_experiment.py first.")
         return
 
-    eval_df_all = build_eval_df(single_data)
     st.markdown("### Overall CBT vs Baseline (across all models and tasks)")
     if eval_df_all.empty:
         st.info("No evaluator outputs yet.")
@@ -90,12 +205,13 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         col_a.metric("Avg relative overall (0-10)", f"{overall_mean:.2f}")
         col_b.metric("Avg lift (% of max)", f"{lift_pct_mean:.1f}%")
 
-        summary = (
-            eval_df_all.groupby("model_id")[["overall", "clarity", "coherence", "reasoning_depth", "safety", "lift_pct"]]
-            .mean()
-            .reset_index()
+        totals = score_totals(eval_df_all)
+        summary = mean_by(
+            totals,
+            ["model_id"],
+            ["overall", "clarity", "coherence", "reasoning_depth", "safety", "lift_pct"],
         )
-        st.dataframe(summary, use_container_width=True)
+        st.table(summary.round(2))
 
         chart = (
             alt.Chart(summary)
@@ -109,20 +225,15 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         st.altair_chart(chart, use_container_width=True)
 
         by_task = (
-            eval_df_all.groupby("task_id")[["overall", "lift_pct"]]
-            .mean()
-            .reset_index()
+            mean_by(totals, ["task_id"], ["overall", "lift_pct"])
             .sort_values("overall", ascending=False)
         )
         st.markdown("**Average overall by task (CBT vs baseline)**")
-        st.dataframe(by_task, use_container_width=True)
+        st.table(by_task.round(2))
 
         st.markdown("**Heatmap: Model × Task (overall score)**")
-        model_task = (
-            eval_df_all.groupby(["model_id", "task_id"])[["overall", "lift_pct"]]
-            .mean()
-            .reset_index()
-        )
+        # one pre-aggregated cell per model x task; only what the chart encodes
+        model_task = mean_by(totals, ["model_id", "task_id"], ["overall"])
         heatmap = (
             alt.Chart(model_task)
             .mark_rect()
@@ -136,21 +247,26 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         st.altair_chart(heatmap, use_container_width=True)
 
         st.markdown("**Distribution of overall scores (all models, tasks, evaluators)**")
+        box_df, outliers = box_stats(eval_df_all, "model_id", "overall")
+        box_base = alt.Chart(box_df).encode(x=alt.X("model_id:N", title="Model"))
         box = (
-            alt.Chart(eval_df_all)
-            .mark_boxplot()
-            .encode(x=alt.X("model_id:N", title="Model"), y=alt.Y("overall:Q"))
+            box_base.mark_rule().encode(y=alt.Y("lower:Q", title="overall"), y2="upper:Q")
+            + box_base.mark_bar(size=14).encode(
+                y="q1:Q",
+                y2="q3:Q",
+                tooltip=["model_id", "lower", "q1", "median", "q3", "upper"],
+            )
+            + box_base.mark_tick(color="white", size=14).encode(y="median:Q")
+            + alt.Chart(outliers).mark_point().encode(x="model_id:N", y="overall:Q")
         )
         st.altair_chart(box, use_container_width=True)
 
         st.markdown("**Average overall by evaluator**")
         by_eval = (
-            eval_df_all.groupby("evaluator")[["overall"]]
-            .mean()
-            .reset_index()
+            mean_by(totals, ["evaluator"], ["overall"])
             .sort_values("overall", ascending=False)
         )
-        st.dataframe(by_eval, use_container_width=True)
+        st.table(by_eval.round(2))
         eval_bar = (
             alt.Chart(by_eval)
             .mark_bar()
@@ -161,13 +277,11 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         st.markdown("### Delta view (CBT lift vs baseline)")
         # Scores are already relative (CBT vs baseline), so treat them as the delta
         delta_model = (
-            eval_df_all.groupby("model_id")[["overall", "lift_pct"]]
-            .mean()
-            .reset_index()
+            mean_by(totals, ["model_id"], ["overall", "lift_pct"])
             .sort_values("overall", ascending=False)
         )
         st.markdown("**CBT lift by model (mean relative overall score and % of max)**")
-        st.dataframe(delta_model, use_container_width=True)
+        st.table(delta_model.round(2))
         delta_chart = (
             alt.Chart(delta_model)
             .mark_bar()
@@ -180,13 +294,11 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         st.altair_chart(delta_chart, use_container_width=True)
 
         delta_task = (
-            eval_df_all.groupby("task_id")[["overall", "lift_pct"]]
-            .mean()
-            .reset_index()
+            mean_by(totals, ["task_id"], ["overall", "lift_pct"])
             .sort_values("overall", ascending=False)
         )
         st.markdown("**CBT lift by task (mean relative overall score and % of max)**")
-        st.dataframe(delta_task, use_container_width=True)
+        st.table(delta_task.round(2))
         delta_task_chart = (
             alt.Chart(delta_task)
             .mark_bar()
@@ -198,21 +310,17 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
         )
         st.altair_chart(delta_task_chart, use_container_width=True)
 
-    model_ids = sorted({r["model_id"] for r in single_data})
-    task_ids = sorted({r["task_id"] for r in single_data})
+    model_ids, task_ids = ids
 
     col1, col2 = st.columns(2)
     model_choice = col1.selectbox("Model", model_ids)
     task_choice = col2.selectbox("Task", task_ids)
 
-    filtered = [
-        r for r in single_data if r["model_id"] == model_choice and r["task_id"] == task_choice
-    ]
-    if not filtered:
+    rec = records_by_key.get((model_choice, task_choice))
+    if rec is None:
         st.warning("No matching record.")
         return
 
-    rec = filtered[0]
     st.write(f"**Task Prompt:** {rec['task_prompt']}")
 
     tabs = st.tabs(["Baseline", "CBT Raw", "CBT Reflection", "CBT Revised"])
@@ -232,36 +340,40 @@ def render_single_turn(single_data: List[Dict[str, Any]]) -> None:
 
     st.markdown("---")
     st.markdown("**Evaluator Scores**")
-    eval_df = build_eval_df(filtered)
+    selected = (eval_df_all["model_id"] == model_choice) & (eval_df_all["task_id"] == task_choice)
+    eval_df = eval_df_all[selected].reset_index(drop=True)
     if eval_df.empty:
         st.info("No evaluator outputs yet.")
     else:
         st.dataframe(eval_df, use_container_width=True)
-        agg = eval_df.groupby("model_id")[["clarity", "coherence", "reasoning_depth", "safety", "overall"]].mean().reset_index()
+        agg = mean_by(
+            score_totals(eval_df),
+            ["model_id"],
+            ["clarity", "coherence", "reasoning_depth", "safety", "overall"],
+        )
         st.markdown("**Average Scores (selected model across this task)**")
-        st.dataframe(agg, use_container_width=True)
+        st.table(agg.round(2))
 
     st.markdown("---")
     st.markdown("**Cross-Model Comparison (overall scores)**")
-    full_eval = build_eval_df(single_data)
-    if full_eval.empty:
+    if eval_df_all.empty:
         st.info("No evaluation data to compare yet.")
     else:
-        pivot = (
-            full_eval.groupby(["model_id", "evaluator"])[["overall", "clarity", "coherence", "reasoning_depth", "safety"]]
-            .mean()
-            .reset_index()
+        pivot = mean_by(
+            score_totals(eval_df_all),
+            ["model_id", "evaluator"],
+            ["overall", "clarity", "coherence", "reasoning_depth", "safety"],
         )
-        st.dataframe(pivot, use_container_width=True)
+        st.table(pivot.round(2))
 
 
-def render_longitudinal(long_data: Dict[str, Any]) -> None:
+def render_longitudinal(longitudinal_path: Path, eval_df_all: pd.DataFrame) -> None:
     st.subheader("Longitudinal Tasks (multi-round baseline vs CBT)")
-    if not long_data:
+    model_ids = load_cached(longitudinal_path, list_long_models)
+    if not model_ids:
         st.info("No longitudinal_results.json found in output/. Run run_longitudinal.py first.")
         return
 
-    eval_df_all = build_long_eval_df(long_data)
     st.markdown("### Overall CBT vs Baseline (final round comparison)")
     if eval_df_all.empty:
         st.info("No evaluator outputs yet.")
@@ -272,12 +384,13 @@ def render_longitudinal(long_data: Dict[str, Any]) -> None:
         col_a.metric("Avg relative overall (0-10)", f"{overall_mean:.2f}")
         col_b.metric("Avg lift (% of max)", f"{lift_pct_mean:.1f}%")
 
-        summary = (
-            eval_df_all.groupby("model_id")[["overall", "clarity", "coherence", "reasoning_depth", "safety", "lift_pct"]]
-            .mean()
-            .reset_index()
+        totals = score_totals(eval_df_all)
+        summary = mean_by(
+            totals,
+            ["model_id"],
+            ["overall", "clarity", "coherence", "reasoning_depth", "safety", "lift_pct"],
         )
-        st.dataframe(summary, use_container_width=True)
+        st.table(summary.round(2))
 
         chart = (
             alt.Chart(summary)
@@ -292,12 +405,10 @@ def render_longitudinal(long_data: Dict[str, Any]) -> None:
 
         st.markdown("### Delta view (CBT lift vs baseline, final round)")
         delta_model = (
-            eval_df_all.groupby("model_id")[["overall"]]
-            .mean()
-            .reset_index()
+            mean_by(totals, ["model_id"], ["overall"])
             .sort_values("overall", ascending=False)
         )
-        st.dataframe(delta_model, use_container_width=True)
+        st.table(delta_model.round(2))
         delta_chart = (
             alt.Chart(delta_model)
             .mark_bar()
@@ -310,11 +421,7 @@ def render_longitudinal(long_data: Dict[str, Any]) -> None:
         st.altair_chart(delta_chart, use_container_width=True)
 
         st.markdown("**Heatmap: Model × Task (overall score)**")
-        model_task = (
-            eval_df_all.groupby(["model_id", "task_id"])[["overall", "lift_pct"]]
-            .mean()
-            .reset_index()
-        )
+        model_task = mean_by(totals, ["model_id", "task_id"], ["overall"])
         heatmap = (
             alt.Chart(model_task)
             .mark_rect()
@@ -327,13 +434,16 @@ def render_longitudinal(long_data: Dict[str, Any]) -> None:
         )
         st.altair_chart(heatmap, use_container_width=True)
 
-    model_ids = sorted(long_data.keys())
     model_choice = st.selectbox("Model", model_ids)
+    model_rec = load_cached(longitudinal_path, load_long_model, model_choice)
+    if not model_rec:
+        st.warning("No matching record.")
+        return
 
-    task_ids = sorted(long_data[model_choice]["tasks"].keys())
+    task_ids = sorted(model_rec["tasks"].keys())
     task_choice = st.selectbox("Task", task_ids)
 
-    task_rec = long_data[model_choice]["tasks"][task_choice]
+    task_rec = model_rec["tasks"][task_choice]
     st.write(f"**Task Prompt:** {task_rec['task_prompt']}")
 
     baseline_hist = task_rec["baseline_history"]
@@ -357,25 +467,13 @@ def render_longitudinal(long_data: Dict[str, Any]) -> None:
 
     st.markdown("---")
     st.markdown("**Final Round Evaluation (Baseline vs CBT)**")
-    eval_scores = task_rec.get("final_evaluation") or []
-    if not eval_scores:
+    # same rows the cached table already holds, instead of re-flattening the JSON
+    selected = (eval_df_all["model_id"] == model_choice) & (eval_df_all["task_id"] == task_choice)
+    eval_scores = eval_df_all.loc[selected, ["evaluator", *SCORE_FIELDS]].reset_index(drop=True)
+    if eval_scores.empty:
         st.info("No evaluator scores for longitudinal tasks yet.")
     else:
-        rows = []
-        for ev in eval_scores:
-            parsed = ev.get("score_parsed") or {}
-            rows.append(
-                {
-                    "evaluator": ev.get("evaluator_model_id"),
-                    "clarity": parsed.get("clarity"),
-                    "coherence": parsed.get("coherence"),
-                    "reasoning_depth": parsed.get("reasoning_depth"),
-                    "safety": parsed.get("safety"),
-                    "overall": parsed.get("overall"),
-                    "comment": parsed.get("comment") or ev.get("score_raw"),
-                }
-            )
-        st.dataframe(pd.DataFrame(rows), use_container_width=True)
+        st.dataframe(eval_scores, use_container_width=True)
 
 
 def main() -> None:
@@ -387,18 +485,23 @@ def main() -> None:
 
     single_turn_path = OUTPUT_DIR / "single_turn_results.json"
     longitudinal_path = OUTPUT_DIR / "longitudinal_results.json"
-
-    single_data = load_json(single_turn_path)
-    long_data = load_json(longitudinal_path)
+    single_table_path = OUTPUT_DIR / "single_turn_evaluations.feather"
+    long_table_path = OUTPUT_DIR / "longitudinal_evaluations.feather"
 
     view = st.sidebar.radio(
         "Select view", ["Single-turn (simple+advanced)", "Longitudinal"], index=0
     )
 
     if view.startswith("Single-turn"):
-        render_single_turn(single_data or [])
+        eval_df_all = load_eval_df(single_table_path, single_turn_path, _eval_df_for)
+        render_single_turn(
+            load_cached(single_turn_path, index_single) or {},
+            load_cached(single_turn_path, single_ids) or ([], []),
+            eval_df_all,
+        )
     else:
-        render_longitudinal(long_data or {})
+        eval_df_all = load_eval_df(long_table_path, longitudinal_path, _long_eval_df_for)
+        render_longitudinal(longitudinal_path, eval_df_all)
 
 
 if __name__ == "__main__":
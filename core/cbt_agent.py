@@ -1,8 +1,10 @@
-import json
+import hashlib
 import logging
 from typing import Any, Dict
 
+from core.json_extract import extract_json
 from core.llm_client import LLMClient
+from core.prompt_template import render, split_template
 
 logger = logging.getLogger(__name__)
 
@@ -69,6 +71,10 @@ Now produce your corrected final answer.
 """
 
 
+_DETECTION_CHUNKS = split_template(CBT_DETECTION_PROMPT, "agent_output")
+_REVISION_CHUNKS = split_template(CBT_REVISION_WRAPPER, "previous", "instruction")
+
+
 class CBTAgent:
     """
     CBT meta-agent that:
@@ -80,16 +86,33 @@ class CBTAgent:
 
     def __init__(self, model_name: str) -> None:
         self.client = LLMClient(model_name=model_name, temperature=0.3, max_tokens=1024)
+        # reflections keyed by a digest of the agent output, so an output seen
+        # before (repeated tasks, re-runs in one process) skips the LLM call.
+        # No lock: dict get/set is atomic under the GIL, and a race only runs
+        # the same reflection twice
+        self._eval_cache: Dict[str, Dict[str, Any]] = {}
 
     def evaluate(self, agent_output: str) -> Dict[str, Any]:
-        prompt = CBT_DETECTION_PROMPT.format(agent_output=agent_output)
+        # str() like the prompt rendering, so a None reply keys as "None"
+        key = hashlib.blake2b(str(agent_output).encode("utf-8"), digest_size=16).hexdigest()
+        cached = self._eval_cache.get(key)
+        if cached is not None:
+            logger.info("Reusing cached CBT evaluation for identical agent output")
+            # callers get their own copy, as with a fresh evaluation
+            return dict(cached)
+        parsed = self._evaluate_uncached(agent_output)
+        self._eval_cache[key] = parsed
+        return dict(parsed)
+
+    def _evaluate_uncached(self, agent_output: str) -> Dict[str, Any]:
+        prompt = render(_DETECTION_CHUNKS, agent_output)
         logger.info("Running CBT evaluation on agent output")
         raw = self.client.complete(prompt)
 
-        # best-effort JSON parsing with fallback
-        try:
-            parsed = json.loads(raw)
-        except Exception:
+        # best-effort JSON parsing; only ask the model to repair what the
+        # local extraction (fences, surrounding prose) cannot recover
+        parsed = extract_json(raw)
+        if parsed is None:
             logger.warning("CBT agent returned non-JSON, attempting repair")
             repair_prompt = f"""
 Convert the following text into valid JSON without changing the semantic content.
@@ -99,7 +122,9 @@ TEXT:
 {raw}
 """
             repaired = self.client.complete(repair_prompt)
-            parsed = json.loads(repaired)
+            parsed = extract_json(repaired)
+            if parsed is None:
+                raise ValueError("CBT agent repair did not return a JSON object")
 
         # ensure keys exist with defaults
         if "revision_instruction" not in parsed:
@@ -119,6 +144,4 @@ TEXT:
     def build_revision_prompt(
         self, revision_instruction: str, previous_answer: str
     ) -> str:
-        return CBT_REVISION_WRAPPER.format(
-            instruction=revision_instruction, previous=previous_answer
-        )
+        return render(_REVISION_CHUNKS, previous_answer, revision_instruction)
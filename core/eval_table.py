@@ -0,0 +1,98 @@
+from typing import Any, Dict, List
+from pathlib import Path
+import os
+
+import pandas as pd
+from pyarrow import feather
+
+
+KEY_COLUMNS = ["model_id", "model_name", "task_id", "evaluator"]
+SCORE_COLUMNS = ["clarity", "coherence", "reasoning_depth", "safety", "overall"]
+SCORE_FIELDS = SCORE_COLUMNS + ["comment"]
+EVAL_COLUMNS = [
+    "model_id",
+    "model_name",
+    "task_id",
+    "evaluator",
+    "clarity",
+    "coherence",
+    "reasoning_depth",
+    "safety",
+    "overall",
+    "lift_pct",
+    "comment",
+]
+
+
+def normalize_evaluations(records: List[Dict[str, Any]], record_path: str) -> pd.DataFrame:
+    """
+    Flatten the evaluator outputs stored under `record_path` of each record
+    into one row per evaluator, in a single json_normalize pass.
+
+    The key columns are categoricals whose (sorted) categories cover every
+    record, including ones without evaluator output, so callers can list
+    all model/task ids from `.cat.categories`.
+    """
+    record_keys = {
+        col: sorted({rec[col] for rec in records if rec.get(col) is not None})
+        for col in ("model_id", "model_name", "task_id")
+    }
+    records = [rec for rec in records if rec.get(record_path)]
+
+    if records:
+        df = pd.json_normalize(
+            records,
+            record_path=record_path,
+            meta=["model_id", "model_name", "task_id"],
+            errors="ignore",
+        )
+    else:
+        df = pd.DataFrame()
+    renames = {f"score_parsed.{field}": field for field in SCORE_FIELDS}
+    renames["evaluator_model_id"] = "evaluator"
+    df = df.rename(columns=renames).reindex(columns=EVAL_COLUMNS + ["score_raw"])
+
+    # low-cardinality keys as categoricals so groupbys work on integer codes;
+    # 1-10 scores fit float32 (float keeps NaN for unparsed evaluator output)
+    for col in KEY_COLUMNS:
+        df[col] = pd.Categorical(df[col], categories=record_keys.get(col))
+    for col in SCORE_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+
+    df["lift_pct"] = df["overall"].div(10).mul(100)
+    # empty comments fall back to the raw evaluator text, like missing ones
+    df["comment"] = df["comment"].mask(df["comment"].eq("")).fillna(df["score_raw"])
+    return df[EVAL_COLUMNS]
+
+
+def build_eval_df(records: List[Dict[str, Any]]) -> pd.DataFrame:
+    return normalize_evaluations(records, "evaluation")
+
+
+def build_long_eval_df(long_data: Dict[str, Any]) -> pd.DataFrame:
+    records = [
+        {
+            "model_id": model_id,
+            "model_name": rec.get("model_name"),
+            "task_id": task_id,
+            "final_evaluation": task_rec.get("final_evaluation"),
+        }
+        for model_id, rec in long_data.items()
+        for task_id, task_rec in rec.get("tasks", {}).items()
+    ]
+    return normalize_evaluations(records, "final_evaluation")
+
+
+def write_eval_table(df: pd.DataFrame, path: Path) -> None:
+    """
+    Persist a flat evaluation table as zstd-compressed Feather so the
+    dashboard can load it without re-parsing the JSON results. Written to a
+    temp file and swapped in, so a killed run never leaves a truncated table.
+    """
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    df.reset_index(drop=True).to_feather(tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def read_eval_table(path: Path) -> pd.DataFrame:
+    return feather.read_table(path).to_pandas(self_destruct=True, split_blocks=True)
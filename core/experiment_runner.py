@@ -1,9 +1,8 @@
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import threading
 
-from core.llm_client import LLMClient
+from core.llm_client import LLMClient, shared_client
 from core.cbt_agent import CBTAgent
 
 logger = logging.getLogger(__name__)
@@ -20,16 +19,20 @@ class ExperimentRunner:
         client_model_configs: List[Dict[str, Any]],
         cbt_model_config: Dict[str, Any],
         tasks: List[Dict[str, Any]],
+        max_workers: int = 32,
     ) -> None:
         self.client_model_configs = client_model_configs
         self.cbt_model_config = cbt_model_config
         self.tasks = tasks
+        self.max_workers = max_workers
+        # shared by every worker, so its reflection cache covers the whole run
+        self.cbt_agent = CBTAgent(cbt_model_config["name"])
 
     def _build_client(self, model_cfg: Dict[str, Any]) -> LLMClient:
-        return LLMClient(
-            model_name=model_cfg["name"],
-            max_tokens=model_cfg.get("max_tokens", 2048),
-            temperature=model_cfg.get("temperature", 0.7),
+        return shared_client(
+            model_cfg["name"],
+            model_cfg.get("max_tokens", 2048),
+            model_cfg.get("temperature", 0.7),
         )
 
     def run_baseline(self, model_cfg: Dict[str, Any], task: Dict[str, Any]) -> str:
@@ -39,7 +42,7 @@ class ExperimentRunner:
 
     def run_cbt(self, model_cfg: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
         llm = self._build_client(model_cfg)
-        cbt = CBTAgent(self.cbt_model_config["name"])
+        cbt = self.cbt_agent
 
         raw = llm.complete(task["prompt"])
         reflection = cbt.evaluate(raw)
@@ -62,60 +65,73 @@ class ExperimentRunner:
             "revised": revised,
         }
 
-    def run_all(self) -> List[Dict[str, Any]]:
+    def _run_pair(self, model_cfg: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
+        baseline = self.run_baseline(model_cfg, task)
+        cbt_output = self.run_cbt(model_cfg, task)
+        return {
+            "model_id": model_cfg["id"],
+            "model_name": model_cfg["name"],
+            "task_id": task["id"],
+            "task_prompt": task["prompt"],
+            "condition_results": {
+                "baseline": baseline,
+                "cbt": cbt_output,
+            },
+        }
+
+    def run_all(
+        self,
+        on_record: Optional[Callable[[Dict[str, Any]], None]] = None,
+        completed: Optional[Dict[Tuple[Any, Any], Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        Returns a list of records, one per model x task, each containing:
+        Returns a list of records, one per model x task (in that order), each
+        containing:
         - baseline output
         - CBT condition outputs (raw, reflection, revised)
+
+        Every (model, task) pair is its own job, so parallelism scales with
+        models x tasks up to max_workers rather than with the model count.
+        `on_record`, if given, is called with each new record as soon as it
+        completes (on the calling thread, in completion order). Pairs found
+        in `completed` (keyed by (model_id, task_id)) are reused, not re-run.
         """
-        all_results: List[Dict[str, Any]] = []
-        total_tasks = len(self.tasks) * len(self.client_model_configs)
-        completed_tasks = 0
-        progress_lock = threading.Lock()
-
-        def run_for_model(model_cfg: Dict[str, Any]) -> List[Dict[str, Any]]:
-            nonlocal completed_tasks
-            logger.info("Running single-turn tasks for model: %s", model_cfg["id"])
-            model_results: List[Dict[str, Any]] = []
-
-            for task in self.tasks:
-                baseline = self.run_baseline(model_cfg, task)
-                cbt_output = self.run_cbt(model_cfg, task)
-
-                model_results.append(
-                    {
-                        "model_id": model_cfg["id"],
-                        "model_name": model_cfg["name"],
-                        "task_id": task["id"],
-                        "task_prompt": task["prompt"],
-                        "condition_results": {
-                            "baseline": baseline,
-                            "cbt": cbt_output,
-                        },
-                    }
-                )
+        completed = completed or {}
+        pairs = [(cfg, task) for cfg in self.client_model_configs for task in self.tasks]
+        all_results: List[Any] = [
+            completed.get((cfg["id"], task["id"])) for cfg, task in pairs
+        ]
+        pending = [i for i, rec in enumerate(all_results) if rec is None]
+        total_tasks = len(pairs)
+        completed_tasks = total_tasks - len(pending)
+        if not pending:
+            return all_results
 
-                with progress_lock:
-                    nonlocal completed_tasks
-                    completed_tasks += 1
-                    pct = (completed_tasks / total_tasks) * 100
-                    logger.info(
-                        "Task progress: %.1f%% (%d/%d) model=%s task=%s",
-                        pct,
-                        completed_tasks,
-                        total_tasks,
-                        model_cfg["id"],
-                        task["id"],
-                    )
-
-            return model_results
-
-        with ThreadPoolExecutor(max_workers=len(self.client_model_configs)) as executor:
-            future_to_model = {
-                executor.submit(run_for_model, cfg): cfg for cfg in self.client_model_configs
-            }
-            for fut in as_completed(future_to_model):
-                results = fut.result()
-                all_results.extend(results)
+        logger.info(
+            "Running %d single-turn (model, task) pairs (%d reused) on up to %d workers",
+            len(pending),
+            completed_tasks,
+            min(self.max_workers, len(pending)),
+        )
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+            future_to_idx = {executor.submit(self._run_pair, *pairs[i]): i for i in pending}
+            for fut in as_completed(future_to_idx):
+                i = future_to_idx[fut]
+                all_results[i] = fut.result()
+                model_cfg, task = pairs[i]
+                if on_record is not None:
+                    on_record(all_results[i])
+
+                # only this thread touches the counter, so no lock is needed
+                completed_tasks += 1
+                pct = (completed_tasks / total_tasks) * 100
+                logger.info(
+                    "Task progress: %.1f%% (%d/%d) model=%s task=%s",
+                    pct,
+                    completed_tasks,
+                    total_tasks,
+                    model_cfg["id"],
+                    task["id"],
+                )
 
         return all_results
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Optional
+import re
+
+import orjson
+
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)\s*```", re.DOTALL)
+
+
+def _matching_brace(text: str, start: int) -> Optional[int]:
+    """
+    Index of the "}" closing the "{" at `start`, ignoring braces inside
+    JSON strings; None if the object is never closed.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def extract_json(text: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Best-effort local recovery of a JSON object from model output.
+
+    Handles the common failure modes without another LLM call: markdown
+    fences and prose before/after the object. Returns None when no JSON
+    object can be parsed, so callers can fall back to an LLM repair prompt.
+    """
+    if not text:
+        return None
+
+    # only a reply that already looks like a bare object is worth a direct
+    # parse; fenced or prose-wrapped replies skip straight to extraction
+    # instead of paying for a guaranteed JSONDecodeError
+    if text.lstrip().startswith("{"):
+        try:
+            parsed = orjson.loads(text)
+        except orjson.JSONDecodeError:
+            parsed = None
+        if isinstance(parsed, dict):
+            return parsed
+
+    fenced = _FENCE_RE.search(text) if "```" in text else None
+    if fenced:
+        text = fenced.group(1)
+
+    start = text.find("{")
+    if start == -1:
+        return None
+    end = _matching_brace(text, start)
+    if end is None:
+        return None
+    try:
+        parsed = orjson.loads(text[start : end + 1])
+    except orjson.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
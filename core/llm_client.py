@@ -1,12 +1,67 @@
+import hashlib
 import logging
+from functools import lru_cache
+import math
 import os
+import random
 import time
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Dict, Optional
+
+from core.rate_limiter import bucket_for
 
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
 logger = logging.getLogger(__name__)
 
+MAX_ATTEMPTS = 3
+MAX_BACKOFF_S = 32
+MAX_RETRY_AFTER_S = 120
+
+# One pooled session for every client and worker thread, so calls reuse
+# keep-alive connections instead of paying a TCP + TLS handshake each time.
+# The adapter never retries (max_retries=0): complete()'s loop is the only
+# retry layer, so a call costs at most MAX_ATTEMPTS POSTs, each with a
+# timeout, and Retry-After waits stay capped at MAX_RETRY_AFTER_S.
+_SESSION = requests.Session()
+
+
+def configure_pool(max_connections: int = 64) -> None:
+    """
+    (Re)mount the shared adapter so it keeps up to `max_connections` alive;
+    call before fanning out if more threads than that make calls at once.
+    """
+    _SESSION.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=max_connections,
+            max_retries=0,
+        ),
+    )
+
+
+configure_pool()
+
+
+def _retry_delay(attempt: int, exc: Exception) -> float:
+    """
+    Seconds to wait before the next attempt: the server's Retry-After on
+    429/503, otherwise exponential backoff with jitter so concurrent workers
+    that failed together do not retry in lockstep.
+    """
+    if isinstance(exc, requests.HTTPError) and exc.response is not None:
+        if exc.response.status_code in (429, 503):
+            retry_after = exc.response.headers.get("Retry-After")
+            try:
+                delay = float(retry_after)
+            except (TypeError, ValueError):
+                delay = math.nan  # missing or an HTTP date
+            # nan/inf would make time.sleep raise; fall back to backoff
+            if math.isfinite(delay):
+                return min(max(0.0, delay), MAX_RETRY_AFTER_S)
+    return min(MAX_BACKOFF_S, 2**attempt) + random.uniform(0, 0.5)
+
 
 class LLMClient:
     """
@@ -18,6 +73,7 @@ class LLMClient:
         model_name: str,
         max_tokens: int = 2048,
         temperature: float = 0.7,
+        cache: bool = False,
     ) -> None:
         self.model_name = model_name
         self.max_tokens = max_tokens
@@ -25,11 +81,30 @@ class LLMClient:
         self.api_key = os.getenv("OPENROUTER_API_KEY")
         if not self.api_key:
             raise ValueError("Missing env variable: OPENROUTER_API_KEY")
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+        # opt-in because sampling callers (task runs) expect a fresh draw per
+        # call; keyed by a prompt digest so full prompts are not kept as keys.
+        # No lock: dict get/set is atomic under the GIL, and a race only sends
+        # the same prompt twice
+        self._cache: Optional[Dict[str, str]] = {} if cache else None
 
     def complete(self, prompt: str) -> str:
         """
-        Make a chat completion call with simple retry logic.
+        Make a chat completion call, retrying failures with backoff. With
+        cache=True, a prompt this client already completed is answered from
+        memory without a request.
         """
+        key = None
+        if self._cache is not None:
+            key = hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+            cached = self._cache.get(key)
+            if cached is not None:
+                logger.debug("Model %s prompt cache hit", self.model_name)
+                return cached
+
         payload = {
             "model": self.model_name,
             "messages": [{"role": "user", "content": prompt}],
@@ -39,24 +114,30 @@ class LLMClient:
 
         last_error: Optional[Exception] = None
 
-        for attempt in range(3):
+        bucket = bucket_for(self.model_name)
+
+        for attempt in range(MAX_ATTEMPTS):
             try:
+                # every POST goes through this loop (the adapter does not
+                # retry), so each attempt, retries included, takes a token
+                if bucket is not None:
+                    bucket.acquire()
                 logger.info(
                     "Calling model %s (attempt %s)", self.model_name, attempt + 1
                 )
-                res = requests.post(
+                res = _SESSION.post(
                     OPENROUTER_URL,
-                    headers={
-                        "Authorization": f"Bearer {self.api_key}",
-                        "Content-Type": "application/json",
-                    },
+                    headers=self._headers,
                     json=payload,
                     timeout=60,
                 )
                 res.raise_for_status()
                 data = res.json()
                 logger.debug("Model %s response received", self.model_name)
-                return data["choices"][0]["message"]["content"]
+                content = data["choices"][0]["message"]["content"]
+                if key is not None:
+                    self._cache[key] = content
+                return content
             except Exception as exc:  # noqa: BLE001
                 logger.warning(
                     "Attempt %s failed for model %s: %s",
@@ -65,8 +146,18 @@ class LLMClient:
                     exc,
                 )
                 last_error = exc
-                time.sleep(2)
+                if attempt + 1 < MAX_ATTEMPTS:
+                    time.sleep(_retry_delay(attempt, exc))
 
         raise RuntimeError(
-            f"Failed after 3 retries for model {self.model_name}: {last_error}"
+            f"Failed after {MAX_ATTEMPTS} retries for model {self.model_name}: {last_error}"
         )
+
+
+@lru_cache(maxsize=None)
+def shared_client(model_name: str, max_tokens: int, temperature: float) -> LLMClient:
+    """
+    One uncached LLMClient per (model, max_tokens, temperature), shared by
+    every runner and worker thread; clients hold no per-call state.
+    """
+    return LLMClient(model_name=model_name, max_tokens=max_tokens, temperature=temperature)
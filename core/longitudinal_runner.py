@@ -1,7 +1,9 @@
-from typing import Any, Dict, List, Literal
+from dataclasses import dataclass
+from typing import Any, Dict, List, Literal, Union
+import hashlib
 import logging
 
-from core.llm_client import LLMClient
+from core.llm_client import LLMClient, shared_client
 from core.cbt_agent import CBTAgent
 
 logger = logging.getLogger(__name__)
@@ -10,6 +12,29 @@ logger = logging.getLogger(__name__)
 Condition = Literal["baseline", "cbt"]
 
 
+# Round records are slotted dataclasses rather than dicts: a task keeps every
+# round alive until the run is written, and orjson serializes dataclasses
+# natively to the same JSON objects the dict literals produced.
+@dataclass(slots=True)
+class BaselineRound:
+    round: int
+    prompt: str
+    raw: str
+
+
+@dataclass(slots=True)
+class CBTRound:
+    round: int
+    prompt: str
+    raw: str
+    reflection: Dict[str, Any]
+    revision_prompt_sha1: str
+    revised: str
+
+
+RoundRecord = Union[BaselineRound, CBTRound]
+
+
 class LongitudinalRunner:
     """
     Runs multi-round tasks under two conditions:
@@ -24,12 +49,14 @@ class LongitudinalRunner:
     ) -> None:
         self.rounds = rounds
         self.cbt_model_config = cbt_model_config
+        # shared by every worker, so its reflection cache covers the whole run
+        self.cbt_agent = CBTAgent(cbt_model_config["name"])
 
     def _build_client(self, model_cfg: Dict[str, Any]) -> LLMClient:
-        return LLMClient(
-            model_name=model_cfg["name"],
-            max_tokens=model_cfg.get("max_tokens", 2048),
-            temperature=model_cfg.get("temperature", 0.7),
+        return shared_client(
+            model_cfg["name"],
+            model_cfg.get("max_tokens", 2048),
+            model_cfg.get("temperature", 0.7),
         )
 
     def run_condition(
@@ -37,17 +64,14 @@ class LongitudinalRunner:
         model_cfg: Dict[str, Any],
         task: Dict[str, Any],
         condition: Condition,
-    ) -> List[Dict[str, Any]]:
+    ) -> List[RoundRecord]:
         """
         Returns per-round history for one model, one task, and one condition.
         """
         llm = self._build_client(model_cfg)
-        history: List[Dict[str, Any]] = []
+        history: List[RoundRecord] = []
         last_output: str | None = None
-
-        cbt_agent = None
-        if condition == "cbt":
-            cbt_agent = CBTAgent(self.cbt_model_config["name"])
+        cbt_agent = self.cbt_agent if condition == "cbt" else None
 
         for r in range(1, self.rounds + 1):
             logger.info(
@@ -68,11 +92,7 @@ class LongitudinalRunner:
 
             if condition == "baseline":
                 # no CBT feedback, raw is the round output
-                round_record = {
-                    "round": r,
-                    "prompt": prompt,
-                    "raw": raw,
-                }
+                round_record: RoundRecord = BaselineRound(round=r, prompt=prompt, raw=raw)
                 last_output = raw
             else:
                 assert cbt_agent is not None
@@ -83,14 +103,18 @@ class LongitudinalRunner:
                 )
                 revised = llm.complete(revision_prompt)
 
-                round_record = {
-                    "round": r,
-                    "prompt": prompt,
-                    "raw": raw,
-                    "reflection": reflection,
-                    "revision_prompt": revision_prompt,
-                    "revised": revised,
-                }
+                round_record = CBTRound(
+                    round=r,
+                    prompt=prompt,
+                    raw=raw,
+                    reflection=reflection,
+                    # the full prompt is raw + the revision instruction wrapped
+                    # in a fixed template, so only a digest is kept for audit
+                    revision_prompt_sha1=hashlib.sha1(
+                        revision_prompt.encode("utf-8")
+                    ).hexdigest(),
+                    revised=revised,
+                )
                 last_output = revised
 
             history.append(round_record)
@@ -0,0 +1,36 @@
+from string import Formatter
+from typing import Any, Tuple
+
+
+def split_template(template: str, *fields: str) -> Tuple[str, ...]:
+    """
+    Split a str.format template into the literal chunks around `fields`
+    (which must appear once each, in that order), with "{{"/"}}" already
+    unescaped, so prompts can be rendered with a single "".join of the
+    chunks and the values instead of re-parsing the template per call.
+    """
+    chunks = [""]
+    seen = []
+    for literal, field, _spec, _conversion in Formatter().parse(template):
+        chunks[-1] += literal
+        if field is not None:
+            seen.append(field)
+            chunks.append("")
+    if tuple(seen) != fields:
+        raise ValueError(f"Template fields {seen} do not match {list(fields)}")
+    return tuple(chunks)
+
+
+def render(chunks: Tuple[str, ...], *values: Any) -> str:
+    """
+    Interleave `values` between the chunks from split_template. Non-str
+    values are converted with str(), as str.format would, so a None or list
+    from model output renders as text instead of failing the join.
+    """
+    if len(values) != len(chunks) - 1:
+        raise ValueError(f"Expected {len(chunks) - 1} values, got {len(values)}")
+    parts = [chunks[0]]
+    for value, chunk in zip(values, chunks[1:]):
+        parts.append(value if isinstance(value, str) else str(value))
+        parts.append(chunk)
+    return "".join(parts)
@@ -0,0 +1,64 @@
+from typing import Dict, Optional
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills at `rate` tokens per second up to
+    `capacity`, and acquire() blocks until a token is available.
+    """
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.last_refill) * self.rate
+                )
+                self.last_refill = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            # sleep outside the lock so other threads can refill/check
+            time.sleep(wait)
+
+
+_requests_per_minute: Optional[float] = None
+_buckets: Dict[str, TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def set_requests_per_minute(requests_per_minute: Optional[float]) -> None:
+    """
+    Limit every model to `requests_per_minute` calls, shared across all
+    threads and clients; None (the default) disables the limit.
+    """
+    global _requests_per_minute
+    with _buckets_lock:
+        _requests_per_minute = requests_per_minute or None
+        _buckets.clear()
+
+
+def bucket_for(model_name: str) -> Optional[TokenBucket]:
+    """
+    The shared bucket gating calls to `model_name`, or None when unlimited.
+    """
+    with _buckets_lock:
+        if _requests_per_minute is None:
+            return None
+        bucket = _buckets.get(model_name)
+        if bucket is None:
+            rate = _requests_per_minute / 60
+            # allow up to one second's worth of calls as a burst
+            bucket = TokenBucket(rate=rate, capacity=max(1.0, rate))
+            _buckets[model_name] = bucket
+        return bucket
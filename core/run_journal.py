@@ -0,0 +1,29 @@
+from typing import Any, Dict, Tuple
+import logging
+from pathlib import Path
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+def load_journal(path: Path) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+    """
+    Records an interrupted run already appended to its JSONL journal, keyed
+    by (model_id, task_id), so the next run can skip them. A torn last line
+    (crash mid-write) is ignored.
+    """
+    done: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+    if not path.exists():
+        return done
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                rec = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                logger.warning("Skipping unreadable line in %s", path)
+                continue
+            done[(rec["model_id"], rec["task_id"])] = rec
+    if done:
+        logger.info("Resuming: %s (model, task) results found in %s", len(done), path)
+    return done
@@ -1,7 +1,23 @@
+from functools import lru_cache
+from pathlib import Path
 from typing import Any, Dict
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it, pure Python otherwise
+_Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def load_tasks(path: str) -> Dict[str, Any]:
+
+@lru_cache(maxsize=32)
+def _load_tasks(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+        return yaml.load(f, Loader=_Loader)
+
+
+def load_tasks(path: str) -> Dict[str, Any]:
+    """
+    Parse a task YAML file, reusing the previous parse while the file is
+    unchanged (same mtime and size). The result is shared between callers,
+    so treat it as read-only.
+    """
+    stat = Path(path).stat()
+    return _load_tasks(path, stat.st_mtime_ns, stat.st_size)
@@ -1,30 +1,45 @@
-import json
+import atexit
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import logging.handlers
+import queue
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+import orjson
 import yaml
 from dotenv import load_dotenv
 
 from core.task_loader import load_tasks
+from core.llm_client import configure_pool
+from core.rate_limiter import set_requests_per_minute
 from core.experiment_runner import ExperimentRunner
 from core.evaluator import Evaluator
+from core.eval_table import build_eval_df, write_eval_table
+from core.run_journal import load_journal
 
 
 def setup_logging(output_dir: Path) -> None:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_path = output_dir / f"experiment_{timestamp}.log"
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
     handlers = [
         logging.FileHandler(log_path, encoding="utf-8"),
         logging.StreamHandler(),
     ]
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=handlers,
-    )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # worker threads only enqueue records; a single listener thread does the
+    # file/stderr writes, so workers never wait on the sinks' locks
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
     logging.getLogger("requests").setLevel(logging.WARNING)
     logging.info("Logging initialized. Writing to %s", log_path)
 
@@ -40,6 +55,11 @@ def main() -> None:
     with open(config_dir / "models.yaml", "r", encoding="utf-8") as f:
         config: Dict[str, Any] = yaml.safe_load(f)
 
+    max_concurrency = config.get("max_concurrency", 32)
+    # runner workers and evaluator workers can be in flight at the same time
+    configure_pool(2 * max_concurrency)
+    set_requests_per_minute(config.get("requests_per_minute"))
+
     simple_tasks = load_tasks(str(config_dir / "tasks_simple.yaml")).get(
         "simple_tasks", []
     )
@@ -53,6 +73,7 @@ def main() -> None:
         client_model_configs=config["client_models"],
         cbt_model_config=config["cbt_model"],
         tasks=all_tasks,
+        max_workers=max_concurrency,
     )
 
     logging.info(
@@ -60,50 +81,49 @@ def main() -> None:
         len(config["client_models"]),
         len(all_tasks),
     )
-    results = runner.run_all()
-
-    evaluator = Evaluator(config["evaluator_models"])
-
-    # attach evaluator scores for each (model, task) in parallel
-    with ThreadPoolExecutor(max_workers=32) as executor:
-        future_to_idx = {
-            executor.submit(
-                evaluator.score_pair,
-                rec["condition_results"]["baseline"],
-                rec["condition_results"]["cbt"]["revised"],
-            ): i
-            for i, rec in enumerate(results)
-        }
-
-        total = len(future_to_idx)
-        completed = 0
-        for fut in as_completed(future_to_idx):
-            idx = future_to_idx[fut]
-            rec = results[idx]
-            try:
-                scores = fut.result()
-            except Exception as exc:  # noqa: BLE001
-                logging.error(
-                    "Evaluator scoring failed for model=%s task=%s: %s",
-                    rec["model_id"],
-                    rec["task_id"],
-                    exc,
-                )
-                scores = []
-            rec["evaluation"] = scores
-            completed += 1
-            logging.info(
-                "Evaluator progress: %s/%s (%.0f%%)",
-                completed,
-                total,
-                (completed / total) * 100,
+    # every finished (model, task) record is appended here as it completes;
+    # after a crash, the next run reuses them instead of paying for them again
+    partial_path = output_dir / "single_turn_results.jsonl"
+    completed = load_journal(partial_path)
+    with open(partial_path, "ab") as partial:
+
+        def write_partial(rec: Dict[str, Any]) -> None:
+            partial.write(orjson.dumps(rec, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+            partial.flush()
+
+        results = runner.run_all(on_record=write_partial, completed=completed)
+
+    evaluator = Evaluator(config["evaluator_models"], max_workers=max_concurrency)
+
+    # attach evaluator scores for every (model, task) in one fan-out
+    pairs = [
+        (rec["condition_results"]["baseline"], rec["condition_results"]["cbt"]["revised"])
+        for rec in results
+    ]
+    batch_size = config.get("evaluator_batch_size", 4)
+    for rec, scores in zip(results, evaluator.score_batch(pairs, k=batch_size)):
+        if scores is None:
+            logging.error(
+                "Evaluator scoring failed for model=%s task=%s",
+                rec["model_id"],
+                rec["task_id"],
             )
+            scores = []
+        rec["evaluation"] = scores
+    evaluator.close()
 
     out_path = output_dir / "single_turn_results.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (no ensure_ascii escaping);
+    # OPT_NON_STR_KEYS keeps numeric model/task ids serializable like json.dump
+    with open(out_path, "wb") as f:
+        f.write(orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    table_path = output_dir / "single_turn_evaluations.feather"
+    write_eval_table(build_eval_df(results), table_path)
+    # the run finished, so the next one starts fresh
+    partial_path.unlink(missing_ok=True)
 
-    logging.info("Single-turn experiment complete → %s", out_path)
+    logging.info("Single-turn experiment complete → %s (evaluations: %s)", out_path, table_path)
 
 
 if __name__ == "__main__":
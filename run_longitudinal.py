@@ -1,30 +1,46 @@
-import json
+import atexit
 import logging
+import logging.handlers
+import queue
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict
 
+import orjson
 import yaml
 from dotenv import load_dotenv
 
 from core.task_loader import load_tasks
+from core.llm_client import configure_pool
+from core.rate_limiter import set_requests_per_minute
 from core.longitudinal_runner import LongitudinalRunner
 from core.evaluator import Evaluator
+from core.eval_table import build_long_eval_df, write_eval_table
+from core.run_journal import load_journal
 
 
 def setup_logging(output_dir: Path) -> None:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     log_path = output_dir / f"longitudinal_{timestamp}.log"
+    formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(name)s: %(message)s")
     handlers = [
         logging.FileHandler(log_path, encoding="utf-8"),
         logging.StreamHandler(),
     ]
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-        handlers=handlers,
-    )
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # worker threads only enqueue records; a single listener thread does the
+    # file/stderr writes, so workers never wait on the sinks' locks
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
     logging.getLogger("requests").setLevel(logging.WARNING)
     logging.info("Logging initialized. Writing to %s", log_path)
 
@@ -40,6 +56,12 @@ def main() -> None:
     with open(config_dir / "models.yaml", "r", encoding="utf-8") as f:
         config: Dict[str, Any] = yaml.safe_load(f)
 
+    max_concurrency = config.get("max_concurrency", 32)
+    # baseline workers, cbt-condition workers and evaluator workers can all
+    # be in flight at the same time
+    configure_pool(3 * max_concurrency)
+    set_requests_per_minute(config.get("requests_per_minute"))
+
     tasks_long = load_tasks(str(config_dir / "tasks_longitudinal.yaml")).get(
         "longitudinal_tasks", []
     )
@@ -49,28 +71,41 @@ def main() -> None:
         rounds=rounds,
         cbt_model_config=config["cbt_model"],
     )
-    evaluator = Evaluator(config["evaluator_models"])
+    evaluator = Evaluator(config["evaluator_models"], max_workers=max_concurrency)
 
     all_results: Dict[str, Any] = {}
 
+    # the two conditions of a (model, task) are independent: the outer worker
+    # runs the baseline while the cbt condition runs here. Jobs in this pool
+    # never wait on other futures, so the nested pools cannot deadlock.
+    condition_executor = ThreadPoolExecutor(
+        max_workers=max_concurrency, thread_name_prefix="cbt-condition"
+    )
+
     def run_single_task(model_cfg: Dict[str, Any], task: Dict[str, Any]) -> Dict[str, Any]:
         logging.info(
             "Running longitudinal task concurrently: model=%s task=%s",
             model_cfg["id"],
             task["id"],
         )
-        baseline_hist = runner.run_condition(
-            model_cfg=model_cfg,
-            task=task,
-            condition="baseline",
-        )
-        cbt_hist = runner.run_condition(
+        cbt_future = condition_executor.submit(
+            runner.run_condition,
             model_cfg=model_cfg,
             task=task,
             condition="cbt",
         )
-        baseline_final = baseline_hist[-1].get("raw", "")
-        cbt_final = cbt_hist[-1].get("revised") or cbt_hist[-1].get("raw", "")
+        try:
+            baseline_hist = runner.run_condition(
+                model_cfg=model_cfg,
+                task=task,
+                condition="baseline",
+            )
+        except Exception:
+            cbt_future.cancel()
+            raise
+        cbt_hist = cbt_future.result()
+        baseline_final = baseline_hist[-1].raw
+        cbt_final = cbt_hist[-1].revised or cbt_hist[-1].raw
         eval_scores = evaluator.score_pair(baseline_final, cbt_final)
         return {
             "model_id": model_cfg["id"],
@@ -84,13 +119,37 @@ def main() -> None:
             "final_evaluation": eval_scores,
         }
 
-    # run each model/task pair concurrently (up to 32 threads)
-    with ThreadPoolExecutor(max_workers=32) as executor:
+    def add_result(res: Dict[str, Any]) -> None:
+        model_id = res["model_id"]
+        if model_id not in all_results:
+            all_results[model_id] = {"model_name": res["model_name"], "tasks": {}}
+        all_results[model_id]["tasks"][res["task_id"]] = {
+            "task_prompt": res["task_prompt"],
+            "baseline_history": res["baseline_history"],
+            "cbt_history": res["cbt_history"],
+            "baseline_final": res["baseline_final"],
+            "cbt_final": res["cbt_final"],
+            "final_evaluation": res["final_evaluation"],
+        }
+
+    # every finished (model, task) result is appended here as it completes;
+    # after a crash, the next run reuses them instead of paying for them again
+    partial_path = output_dir / "longitudinal_results.jsonl"
+    resumed = load_journal(partial_path)
+
+    # run each model/task pair concurrently (up to max_concurrency threads)
+    with ThreadPoolExecutor(max_workers=max_concurrency) as executor, open(
+        partial_path, "ab"
+    ) as partial:
         future_to_key = {}
         for model_cfg in config["client_models"]:
             for task in tasks_long:
+                key = (model_cfg["id"], task["id"])
+                if key in resumed:
+                    add_result(resumed[key])
+                    continue
                 fut = executor.submit(run_single_task, model_cfg, task)
-                future_to_key[fut] = (model_cfg["id"], task["id"])
+                future_to_key[fut] = key
 
         total = len(future_to_key)
         completed = 0
@@ -102,16 +161,9 @@ def main() -> None:
                 logging.error("Longitudinal run failed for model=%s task=%s: %s", model_id, task_id, exc)
                 continue
 
-            if model_id not in all_results:
-                all_results[model_id] = {"model_name": res["model_name"], "tasks": {}}
-            all_results[model_id]["tasks"][task_id] = {
-                "task_prompt": res["task_prompt"],
-                "baseline_history": res["baseline_history"],
-                "cbt_history": res["cbt_history"],
-                "baseline_final": res["baseline_final"],
-                "cbt_final": res["cbt_final"],
-                "final_evaluation": res["final_evaluation"],
-            }
+            partial.write(orjson.dumps(res, option=orjson.OPT_NON_STR_KEYS) + b"\n")
+            partial.flush()
+            add_result(res)
             completed += 1
             logging.info(
                 "Longitudinal progress: %s/%s (%.0f%%)",
@@ -120,11 +172,21 @@ def main() -> None:
                 (completed / total) * 100,
             )
 
+    condition_executor.shutdown(wait=True)
+    evaluator.close()
+
     out_path = output_dir / "longitudinal_results.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(all_results, f, indent=2, ensure_ascii=False)
+    # orjson writes UTF-8 bytes directly (no ensure_ascii escaping);
+    # OPT_NON_STR_KEYS keeps numeric model/task ids serializable like json.dump
+    with open(out_path, "wb") as f:
+        f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
+    table_path = output_dir / "longitudinal_evaluations.feather"
+    write_eval_table(build_long_eval_df(all_results), table_path)
+    # the run finished, so the next one starts fresh
+    partial_path.unlink(missing_ok=True)
 
-    logging.info("Longitudinal experiment complete → %s", out_path)
+    logging.info("Longitudinal experiment complete → %s (evaluations: %s)", out_path, table_path)
 
 
 if __name__ == "__main__":